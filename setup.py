@@ -14,7 +14,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     author="r3d-shadow",
-    python_requires=">=3.6",
+    python_requires=">=3.10",
     packages=find_packages(include=["src", "src.*"]),
     install_requires=[
         "PyGithub==2.6.1",
@@ -22,6 +22,7 @@ setup(
         "Jinja2==3.1.6",
         "rich==14.0.0",
         "colorama==0.4.6",
+        "requests==2.32.3",
     ],
     entry_points={
         "console_scripts": [
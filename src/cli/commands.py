@@ -1,6 +1,10 @@
+import functools
+import sys
 from src.config.loader import ConfigLoader
 from src.core.farcade import SyncFacade
+from src.core.selection import RepoSelector
 from src.core.init import write_example_structure
+from src.state.file_state import FileStateManager
 from src.utils.logger import Logger
 
 class Command:
@@ -12,13 +16,75 @@ class InitCommand(Command):
         write_example_structure(args.template_dir)
         Logger.get_logger().info(f"Template scaffold created at {args.template_dir}")
 
+def _config_loader(args):
+    cache_dir = None if args.no_config_cache else args.config_cache
+    return functools.partial(ConfigLoader.load, cache_dir=cache_dir)
+
+def _build_facade(args) -> SyncFacade:
+    return SyncFacade(
+        provider_name=args.provider,
+        token=args.token,
+        template_dir=args.template_dir,
+        state_file=args.state_file,
+        selector=RepoSelector(
+            shard=args.shard,
+            only=args.only,
+            exclude=args.exclude,
+            only_templates=args.only_template,
+            exclude_templates=args.exclude_template,
+        ),
+        render_workers=getattr(args, "render_workers", 0),
+        preflight=not args.no_preflight,
+        cleanup_workers=getattr(args, "cleanup_workers", 4),
+        retries=getattr(args, "retry_failed", 0),
+        retry_backoff=getattr(args, "retry_backoff", 1.0),
+        progress=getattr(args, "progress", "plain"),
+        events_file=getattr(args, "events_file", None),
+    )
+
 class SyncCommand(Command):
     def execute(self, args):
-        config = ConfigLoader.load(args.values)
-        facade = SyncFacade(
-            provider_name=args.provider,
-            token=args.token,
-            template_dir=args.template_dir,
-            state_file=args.state_file
+        interactive = not getattr(args, "non_interactive", False)
+        Logger.throttle(args.log_rate)
+        try:
+            if args.resume:
+                ok = _build_facade(args).resume(args.resume, interactive=interactive)
+            else:
+                if not args.values:
+                    Logger.get_logger().error("--values is required unless --resume is given")
+                    sys.exit(2)
+                config = _config_loader(args)(args.values)
+                ok = _build_facade(args).sync(config, interactive=interactive)
+        finally:
+            # Report lines dropped since the last one printed
+            Logger.throttle(0)
+        if not ok:
+            sys.exit(1)
+
+class WatchCommand(Command):
+    def execute(self, args):
+        facade = _build_facade(args)
+        facade.watch(
+            args.values,
+            _config_loader(args),
+            auto_apply=args.apply,
+            polling=args.poll,
+            interval=args.interval,
         )
-        facade.sync(config, interactive=not getattr(args, "non_interactive", False))
\ No newline at end of file
+
+class StateMergeCommand(Command):
+    def execute(self, args):
+        # Start from the existing output so repos of shards not passed in survive
+        merged = FileStateManager(args.output)
+        merged.load()
+        for path in args.inputs:
+            part = FileStateManager(path)
+            part.load()
+            shard = RepoSelector.partition_shard(path)
+            if shard:
+                # A partition is authoritative for the repos its shard owns,
+                # including ones it no longer tracks.
+                merged.retain_repos(lambda repo, shard=shard: RepoSelector.shard_of(repo, shard[1]) != shard[0])
+            merged.merge(part.state)
+        merged.save()
+        Logger.get_logger().info(f"Merged {len(args.inputs)} state file(s) into {args.output}")
\ No newline at end of file
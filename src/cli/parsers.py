@@ -1,5 +1,7 @@
 import argparse
-from src.cli.commands import InitCommand, SyncCommand
+from src.cli.commands import InitCommand, SyncCommand, StateMergeCommand, WatchCommand
+from src.config.loader import default_cache_dir
+from src.core.selection import RepoSelector
 
 class ParserBuilder:
     def __init__(self):
@@ -17,15 +19,124 @@ class ParserBuilder:
         sync_parser.add_argument('--provider', choices=['github'], default='github')
         sync_parser.add_argument('--token', required=True)
         sync_parser.add_argument('--template-dir', required=True)
-        sync_parser.add_argument('--values', required=True)
+        sync_parser.add_argument('--values', help='Values file (not needed with --resume)')
         sync_parser.add_argument('--state-file', default='.git-pilot-state.json')
+        sync_parser.add_argument(
+            '--resume',
+            metavar='RUN_ID',
+            help='Re-apply only the failed or pending items of an earlier run, without re-planning'
+        )
+        sync_parser.add_argument(
+            '--retry-failed',
+            type=int,
+            default=0,
+            metavar='N',
+            help='Retry each failing item up to N times with exponential backoff'
+        )
+        sync_parser.add_argument('--retry-backoff', type=float, default=1.0, help='Initial retry delay in seconds')
         sync_parser.add_argument(
             "--non-interactive",
             action="store_true",
             help="Run sync in non-interactive mode (auto-approve all changes)"
         )
+        sync_parser.add_argument(
+            '--render-workers',
+            type=int,
+            default=0,
+            metavar='N',
+            help='Render templates on N worker processes (default: render serially)'
+        )
+        sync_parser.add_argument(
+            '--cleanup-workers',
+            type=int,
+            default=4,
+            metavar='N',
+            help='Delete stale files from up to N branches concurrently'
+        )
+        self._add_config_cache_arguments(sync_parser)
+        self._add_preflight_arguments(sync_parser)
+        self._add_selection_arguments(sync_parser)
+        self._add_progress_arguments(sync_parser)
         sync_parser.set_defaults(command=SyncCommand())
         return self
 
+    def with_watch_command(self):
+        watch_parser = self.subparsers.add_parser('watch', help='Re-plan affected repos whenever templates or values change')
+        watch_parser.add_argument('--provider', choices=['github'], default='github')
+        watch_parser.add_argument('--token', required=True)
+        watch_parser.add_argument('--template-dir', required=True)
+        watch_parser.add_argument('--values', required=True)
+        watch_parser.add_argument('--state-file', default='.git-pilot-state.json')
+        watch_parser.add_argument('--apply', action='store_true', help='Apply each plan automatically')
+        watch_parser.add_argument('--poll', action='store_true', help='Poll for changes instead of using inotify')
+        watch_parser.add_argument('--interval', type=float, default=0.5, help='Polling interval in seconds')
+        self._add_config_cache_arguments(watch_parser)
+        self._add_preflight_arguments(watch_parser)
+        self._add_selection_arguments(watch_parser)
+        watch_parser.set_defaults(command=WatchCommand())
+        return self
+
+    def with_state_command(self):
+        state_parser = self.subparsers.add_parser('state', help='Manage sync state files')
+        state_subparsers = state_parser.add_subparsers(dest='state_command', required=True)
+        merge_parser = state_subparsers.add_parser('merge', help='Combine shard state partitions')
+        merge_parser.add_argument('inputs', nargs='+', help='State files to merge')
+        merge_parser.add_argument('--output', default='.git-pilot-state.json')
+        merge_parser.set_defaults(command=StateMergeCommand())
+        return self
+
+    @staticmethod
+    def _shard(value):
+        try:
+            return RepoSelector.parse_shard(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    def _add_config_cache_arguments(self, parser):
+        parser.add_argument(
+            '--config-cache',
+            default=default_cache_dir(),
+            help='Directory for cached parsed values files'
+        )
+        parser.add_argument('--no-config-cache', action='store_true', help='Always re-parse values files')
+
+    def _add_preflight_arguments(self, parser):
+        parser.add_argument(
+            '--no-preflight',
+            action='store_true',
+            help='Always render and compare every repo instead of skipping those whose branch head and inputs are unchanged'
+        )
+
+    def _add_selection_arguments(self, parser):
+        parser.add_argument(
+            '--shard',
+            type=self._shard,
+            help='Only handle shard i of N (e.g. 2/8); state goes to a per-shard partition'
+        )
+        parser.add_argument('--only', action='append', metavar='REGEX', help='Only sync repos matching this regex')
+        parser.add_argument('--exclude', action='append', metavar='REGEX', help='Skip repos matching this regex')
+        parser.add_argument('--only-template', action='append', metavar='REGEX', help='Only render templates matching this regex')
+        parser.add_argument('--exclude-template', action='append', metavar='REGEX', help='Skip templates matching this regex')
+
+    def _add_progress_arguments(self, parser):
+        parser.add_argument(
+            '--progress',
+            choices=['auto', 'rich', 'plain'],
+            default='auto',
+            help='Live dashboard (rich), log lines only (plain), or rich when non-interactive on a terminal (auto)'
+        )
+        parser.add_argument(
+            '--events-file',
+            metavar='PATH',
+            help="Append progress events as JSON Lines to PATH ('-' for stdout)"
+        )
+        parser.add_argument(
+            '--log-rate',
+            type=int,
+            default=20,
+            metavar='N',
+            help='Print at most N info lines per second; 0 for no limit'
+        )
+
     def build(self):
         return self.parser
\ No newline at end of file
@@ -1,16 +1,94 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import sys
 import yaml
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Mapping, Optional, Tuple
 
+# libyaml's C loader is an order of magnitude faster when PyYAML was built with it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+# Bump whenever the parsed or merged representation changes
+CACHE_VERSION = 4
+
+FRAGMENTS_DIR = "values.d"
+
+# Least recently used cache entries are evicted beyond this size
+CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+
+_PATTERNS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_patterns(patterns: Iterable[str]) -> Tuple[str, ...]:
+    """Return a shared tuple for equal pattern lists so repos reuse one object."""
+    key = tuple(sys.intern(p) for p in patterns)
+    return _PATTERNS.setdefault(key, key)
+
+
+class ReadOnlyChainMap(ChainMap):
+    """ChainMap that rejects writes, so a digest computed over it stays valid."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("RepoConfig.vars is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    pop = popitem = clear = update = setdefault = _readonly
+
+
+def _canonical(value: Any) -> Any:
+    """
+    JSON-ready form of `value` with mapping keys turned into type-tagged
+    strings, so keys of mixed types (e.g. `80` and `"name"`) sort, and `80`
+    and `"80"` stay distinct.
+    """
+    if isinstance(value, Mapping):
+        return sorted([f"{type(k).__name__}:{k!r}", _canonical(v)] for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class RepoConfig:
+    """
+    Immutable repo entry. `vars` is a read-only ChainMap whose later maps are
+    the defaults shared by every repo in the same group, and `digest` is a
+    canonical hash of all fields, used for equality and as a cache key.
+    """
     name: str
     branch: str
     message: str
     path: str
-    vars: Dict = field(default_factory=dict)
-    templates: List[str] = field(default_factory=list)
+    vars: Mapping = field(default_factory=ReadOnlyChainMap)
+    templates: Tuple[str, ...] = ()
+    assets: Tuple[str, ...] = ()
+    digest: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "templates", intern_patterns(self.templates or ()))
+        object.__setattr__(self, "assets", intern_patterns(self.assets or ()))
+        if not isinstance(self.vars, ReadOnlyChainMap):
+            maps = self.vars.maps if isinstance(self.vars, ChainMap) else [self.vars or {}]
+            object.__setattr__(self, "vars", ReadOnlyChainMap(*maps))
+        canonical = json.dumps(
+            _canonical([self.name, self.branch, self.message, self.path, self.templates, self.assets, dict(self.vars)]),
+            separators=(",", ":"), default=str,
+        )
+        object.__setattr__(self, "digest", hashlib.sha256(canonical.encode("utf-8")).hexdigest())
+
+    def __eq__(self, other):
+        if not isinstance(other, RepoConfig):
+            return NotImplemented
+        return self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
 
 
 @dataclass
@@ -18,25 +96,172 @@ class Config:
     repos: List[RepoConfig]
 
 
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "git-pilot", "config")
+
+
 class ConfigLoader:
     @staticmethod
-    def load(path: str) -> Config:
-        with open(path, "r") as f:
-            data = yaml.safe_load(f)
-
-        defaults = data.get("defaults", {})
-
-        def apply_defaults(repo: Dict) -> RepoConfig:
-            # Merge defaults with repo (repo overrides default)
-            merged = {
-                "name": repo["name"],
-                "branch": repo.get("branch", defaults.get("branch")),
-                "message": repo.get("message", defaults.get("message")),
-                "path": repo.get("path", defaults.get("path", ".github/workflows")),
-                "vars": {**defaults.get("vars", {}), **repo.get("vars", {})},
-                "templates": repo.get("templates", defaults.get("templates", [])),
-            }
-            return RepoConfig(**merged)
-
-        repos = [apply_defaults(r) for r in data.get("repos", [])]
-        return Config(repos=repos)
\ No newline at end of file
+    def fragment_paths(path: str) -> List[str]:
+        """Return `values.d/*.yml` files next to `path`, in load order."""
+        fragments_dir = os.path.join(os.path.dirname(os.path.abspath(path)), FRAGMENTS_DIR)
+        return sorted(glob.glob(os.path.join(fragments_dir, "*.yml")) + glob.glob(os.path.join(fragments_dir, "*.yaml")))
+
+    @staticmethod
+    def load(path: str, cache_dir: Optional[str] = None) -> Config:
+        """
+        Load `path` plus any `values.d/*.yml` fragments next to it.
+
+        Each fragment may carry its own `defaults`, layered over the defaults
+        of the main file for the repos listed in that fragment. When
+        `cache_dir` is given, parsed files and the merged config are cached
+        by content hash so unchanged files are never parsed twice.
+        """
+        paths = [path] + ConfigLoader.fragment_paths(path)
+        # Reading and hashing release the GIL; parsing is done separately below
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+            blobs = list(pool.map(ConfigLoader._read, paths))
+
+        config_key = hashlib.sha256(
+            f"{CACHE_VERSION}".encode() + b"".join(digest.encode() for _, digest in blobs)
+        ).hexdigest()
+        if cache_dir:
+            cached = ConfigLoader._cache_get(cache_dir, f"config-{config_key}")
+            if isinstance(cached, Config):
+                return cached
+
+        documents = ConfigLoader._parse_all(blobs, cache_dir)
+
+        data = documents[0] or {}
+        defaults = ConfigLoader.merge_defaults({}, data.get("defaults", {}) or {})
+        repos = [ConfigLoader.apply_defaults(r, defaults) for r in data.get("repos", []) or []]
+        for fragment in documents[1:]:
+            fragment = fragment or {}
+            group_defaults = ConfigLoader.merge_defaults(defaults, fragment.get("defaults", {}) or {})
+            repos.extend(ConfigLoader.apply_defaults(r, group_defaults) for r in fragment.get("repos", []) or [])
+
+        config = Config(repos=repos)
+        if cache_dir:
+            ConfigLoader._cache_put(cache_dir, f"config-{config_key}", config)
+        return config
+
+    @staticmethod
+    def merge_defaults(base: Dict, override: Dict) -> Dict:
+        """Layer `override` over `base`; vars become a ChainMap over the base layers."""
+        merged = {**base, **override}
+        merged["vars"] = ChainMap(override.get("vars") or {}, *ConfigLoader._layers(base.get("vars")))
+        merged["templates"] = intern_patterns(merged.get("templates") or ())
+        merged["assets"] = intern_patterns(merged.get("assets") or ())
+        return merged
+
+    @staticmethod
+    def _layers(vars: Optional[Mapping]) -> List[Mapping]:
+        if isinstance(vars, ChainMap):
+            return vars.maps
+        return [vars] if vars else []
+
+    @staticmethod
+    def apply_defaults(repo: Dict, defaults: Dict) -> RepoConfig:
+        # Merge defaults with repo (repo overrides default). Default layers are
+        # shared rather than copied, which is why `vars` is read-only.
+        merged = {
+            "name": repo["name"],
+            "branch": repo.get("branch", defaults.get("branch")),
+            "message": repo.get("message", defaults.get("message")),
+            "path": repo.get("path", defaults.get("path", ".github/workflows")),
+            "vars": ReadOnlyChainMap(dict(repo.get("vars") or {}), *ConfigLoader._layers(defaults.get("vars"))),
+            "templates": repo.get("templates", defaults.get("templates", ())),
+            "assets": repo.get("assets", defaults.get("assets", ())),
+        }
+        return RepoConfig(**merged)
+
+    @staticmethod
+    def _read(path: str) -> Tuple[bytes, str]:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return raw, hashlib.sha256(raw).hexdigest()
+
+    @staticmethod
+    def _parse_all(blobs: List[Tuple[bytes, str]], cache_dir: Optional[str]) -> List[Any]:
+        """
+        Parse every blob, taking cached documents where possible. YAML parsing
+        holds the GIL, so several cache misses are parsed on worker processes.
+        """
+        documents: List[Any] = [None] * len(blobs)
+        misses = []
+        for i, (_, digest) in enumerate(blobs):
+            cached = ConfigLoader._cache_get(cache_dir, f"doc-{CACHE_VERSION}-{digest}") if cache_dir else None
+            if cached is None:
+                misses.append(i)
+            else:
+                documents[i] = cached
+
+        workers = min(len(misses), os.cpu_count() or 1, 8)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(ConfigLoader._parse, [blobs[i][0] for i in misses]))
+        else:
+            parsed = [ConfigLoader._parse(blobs[i][0]) for i in misses]
+
+        for i, data in zip(misses, parsed):
+            documents[i] = data
+            if cache_dir and data is not None:
+                ConfigLoader._cache_put(cache_dir, f"doc-{CACHE_VERSION}-{blobs[i][1]}", data)
+        return documents
+
+    @staticmethod
+    def _parse(raw: bytes) -> Any:
+        return yaml.load(raw, Loader=YamlLoader)
+
+    @staticmethod
+    def _cache_get(cache_dir: str, key: str) -> Any:
+        path = os.path.join(cache_dir, key + ".pickle")
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            # Missing, stale or corrupt entries are simply re-parsed
+            return None
+        try:
+            # mtime tracks last use for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    @staticmethod
+    def _cache_put(cache_dir: str, key: str, value: Any) -> None:
+        path = os.path.join(cache_dir, key + ".pickle")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            ConfigLoader._cache_prune(cache_dir)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _cache_prune(cache_dir: str, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        """Evict least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another process may have evicted it already
+                pass
+            total -= size
@@ -1,25 +1,127 @@
+import os
+import sys
 from src.providers.base import ProviderFactory
 from src.state.file_state import FileStateManager
+from src.state.run_manifest import RunManifest
 from src.template_engine.jinja_loader import JinjaTemplateEngine
+from src.template_engine.parallel import ParallelRenderer
+from src.template_engine.assets import AssetStore
 from src.diff.interactive import RichDiffViewer
 from src.core.sync_engine import SyncEngine
+from src.utils.logger import Logger
+from src.core.selection import RepoSelector
+from src.core.watch import WatchSession
+from src.utils.watcher import create_watcher
+from src.progress.events import ProgressReporter
+from src.progress.sinks import JsonLinesSink
 
 class SyncFacade:
-    def __init__(self, provider_name, token, template_dir, state_file):
+    def __init__(self, provider_name, token, template_dir, state_file, selector=None, render_workers=0, preflight=True, cleanup_workers=4,
+                 retries=0, retry_backoff=1.0, progress="plain", events_file=None):
+        self.selector = selector or RepoSelector()
         self.provider = ProviderFactory.create(provider_name, token)
-        self.state = FileStateManager(state_file)
-        self.template = JinjaTemplateEngine(template_dir)
+        self.base_state_file = state_file
+        self.state = FileStateManager(self.selector.partition_path(state_file))
+        self.template = JinjaTemplateEngine(template_dir, ignore=self._is_run_file)
+        self.assets = AssetStore(template_dir)
+        self.renderer = ParallelRenderer(template_dir, render_workers) if render_workers and render_workers > 1 else None
         self.diff = RichDiffViewer()
         self.provider_name = provider_name
+        self.preflight = preflight
+        self.cleanup_workers = cleanup_workers
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.runs_dir = RunManifest.runs_dir_for(self.state.path)
+        self.progress = progress
+        self.events_file = events_file
 
-    def sync(self, config, interactive: bool = True):
-        engine = SyncEngine(
+    def _is_run_file(self, path: str) -> bool:
+        # State partitions and run manifests may live under the template dir
+        base = os.path.abspath(self.base_state_file)
+        stem = os.path.splitext(base)[0]
+        return path.startswith((base, stem + ".", self.runs_dir + os.sep))
+
+    def _load_state(self):
+        # A shard without its own partition yet starts from the shared state
+        # file, keeping only the repos it owns.
+        if self.selector.shard and not os.path.exists(self.state.path) and os.path.exists(self.base_state_file):
+            base = FileStateManager(self.base_state_file)
+            base.load()
+            base.retain_repos(self.selector.owns_repo)
+            self.state.state = base.state
+        else:
+            self.state.load()
+
+    def _reporter(self, interactive: bool) -> ProgressReporter:
+        sinks = []
+        if self.events_file:
+            sinks.append(JsonLinesSink(self.events_file))
+        mode = self.progress
+        if mode == "auto":
+            # The dashboard would fight the diff viewer and is noise in CI logs
+            mode = "rich" if not interactive and sys.stderr.isatty() else "plain"
+        if mode == "rich":
+            from src.progress.dashboard import RichDashboard
+            sinks.append(RichDashboard(rate_limit=self.provider.get_rate_limit))
+        return ProgressReporter(sinks)
+
+    def _engine(self, interactive: bool, progress: ProgressReporter = None) -> SyncEngine:
+        return SyncEngine(
             provider=self.provider,
             state_mgr=self.state,
             template_eng=self.template,
             diff_viewer=self.diff,
             interactive=interactive,
             provider_name=self.provider_name,
+            selector=self.selector,
+            renderer=self.renderer,
+            preflight=self.preflight,
+            asset_store=self.assets,
+            cleanup_workers=self.cleanup_workers,
+            runs_dir=self.runs_dir,
+            retries=self.retries,
+            retry_backoff=self.retry_backoff,
+            progress=progress,
         )
-        self.state.load()
-        engine.sync(config)
+
+    def sync(self, config, interactive: bool = True):
+        progress = self._reporter(interactive)
+        engine = self._engine(interactive, progress)
+        self._load_state()
+        try:
+            return engine.sync(config)
+        finally:
+            if self.selector.shard:
+                # No-op runs don't save, but `state merge` needs every partition
+                self.state.save()
+            progress.close()
+            if self.renderer is not None:
+                self.renderer.close()
+
+    def resume(self, run_id, interactive: bool = True):
+        manifest = RunManifest.load(self.runs_dir, run_id)
+        if manifest.provider and manifest.provider != self.provider_name:
+            raise ValueError(f"Run {run_id} was planned for provider '{manifest.provider}', not '{self.provider_name}'")
+        with self._reporter(interactive) as progress:
+            engine = self._engine(interactive, progress)
+            self._load_state()
+            return engine.resume(manifest)
+
+    def watch(self, values_path, load_config, auto_apply: bool = False, polling: bool = False, interval: float = 0.5):
+        engine = self._engine(interactive=False)
+        self._load_state()
+        session = WatchSession(engine, values_path, load_config, auto_apply=auto_apply)
+        session.start()
+
+        paths = [self.template.root_dir, values_path, session.fragments_dir]
+        watcher = create_watcher([p for p in paths if os.path.exists(p)], interval=interval, polling=polling)
+        Logger.get_logger().info(f"Watching {self.template.root_dir} and {values_path} ({type(watcher).__name__})")
+        try:
+            while True:
+                changed = watcher.wait()
+                if changed:
+                    session.on_change(changed)
+        except KeyboardInterrupt:
+            Logger.get_logger().info("Stopped watching.")
+        finally:
+            watcher.close()
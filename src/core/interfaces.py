@@ -1,6 +1,20 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import List, Set, Tuple, Optional, Any, Dict
 
+
+@dataclass
+class PushResult:
+    """
+    Outcome of a write to a branch: the blob SHA of the written file and the
+    commit it produced on top of `parent`. `commit` is None when nothing was
+    committed (e.g. the file was already up to date).
+    """
+    blob_sha: Optional[str] = None
+    commit: Optional[str] = None
+    parent: Optional[str] = None
+
+
 class ProviderInterface(ABC):
     @abstractmethod
     def sync(
@@ -10,8 +24,24 @@ class ProviderInterface(ABC):
         path: str,
         content: str,
         commit_message: str,
-    ) -> List[Tuple[str, str, str, Any, Any]]:
+    ) -> PushResult:
         """
+        Create or update `path` with `content` in a single commit.
+        """
+        pass
+
+    @abstractmethod
+    def sync_file(
+        self,
+        repo: str,
+        branch: str,
+        path: str,
+        source: str,
+        commit_message: str,
+    ) -> PushResult:
+        """
+        Upload the local file at `source` (any size, possibly binary) to `path`
+        without loading it into memory whole.
         """
         pass
 
@@ -28,6 +58,44 @@ class ProviderInterface(ABC):
         """
         pass
 
+    def delete_many(
+        self,
+        repo: str,
+        branch: str,
+        paths: List[str],
+        commit_message: str
+    ) -> Optional[PushResult]:
+        """
+        Delete several files from one branch. Providers that can should do this
+        in a single commit; the default deletes them one by one and returns
+        None, as the resulting commits are unknown.
+        """
+        for path in paths:
+            self.delete(repo=repo, branch=branch, path=path, commit_message=commit_message)
+        return None
+
+    def get_branch_heads(self, refs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Return the head commit SHA for each (repo, branch), ideally in as few
+        requests as possible. Providers without a cheap way to do this return
+        an empty dict, which disables preflight skipping.
+        """
+        return {}
+
+    def get_blob_shas(self, repo: str, branch: str, paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Return the git blob SHA of each path on the branch (None if missing),
+        without fetching file contents. An empty dict means unsupported.
+        """
+        return {}
+
+    def get_rate_limit(self) -> Optional[Tuple[int, int]]:
+        """
+        Return (remaining, limit) of the API quota as last reported by the
+        provider, without making a request. None if unknown or unsupported.
+        """
+        return None
+
 class StateInterface(ABC):
     @abstractmethod
     def load(self) -> None:
@@ -40,28 +108,44 @@ class StateInterface(ABC):
         pass
 
     @abstractmethod
-    def cleanup_old(self, repo: str, branch: str, current_keys: List[str], provider_name: str) -> List[str]:
+    def stale_files(self, repo: str, keep: Dict[str, Set[str]], active_branches: Set[str], provider_name: str) -> List[Tuple[str, str, str]]:
         """
-        Remove state entries not in `current_keys` for the given repo and branch under a specific provider.
-        Returns list of file paths that should be deleted remotely.
+        Return every tracked (branch, key, file_path) of a repo that is no
+        longer wanted: keys not in `keep[branch]` for planned branches, and
+        everything on branches not in `active_branches`. Active branches
+        missing from `keep` are left alone. State is not modified.
         """
         pass
 
     @abstractmethod
-    def cleanup_old_branches(self, repo: str, active_branches: Set[str], provider_name: str) -> List[Tuple[str, str]]:
+    def remove_file_entries(self, repo: str, branch: str, keys: List[str], provider_name: str) -> None:
         """
-        Remove entries from branches that are no longer active under a specific provider.
-        Returns list of (branch, file_path) tuples that should be deleted remotely.
+        Drop the given keys from a branch once their files were deleted
+        remotely, along with the branch and repo entries if left empty.
         """
         pass
 
     @abstractmethod
-    def update_file_entry(self, repo: str, branch: str, key: str, file_path: str, sha: str, rendered: str, provider_name: str) -> None:
+    def update_file_entry(self, repo: str, branch: str, key: str, file_path: str, sha: str, rendered: str, provider_name: str, blob_sha: Optional[str] = None) -> None:
         """
         Update state entry with file metadata.
         """
         pass
 
+    @abstractmethod
+    def get_branch_meta(self, repo: str, branch: str, provider_name: str) -> dict:
+        """
+        Retrieve branch-level metadata (e.g. last known head commit and input digest).
+        """
+        pass
+
+    @abstractmethod
+    def update_branch_meta(self, repo: str, branch: str, provider_name: str, **meta) -> None:
+        """
+        Store branch-level metadata alongside the branch's file entries.
+        """
+        pass
+
     @abstractmethod
     def get_file_entry(self, repo: str, branch: str, key: str, provider_name: str) -> dict:
         """
@@ -80,6 +164,11 @@ class TemplateInterface(ABC):
         """Render a single template with the given vars, returning its content."""
         pass
 
+    @abstractmethod
+    def fingerprint(self) -> str:
+        """Return a digest of every source file that can affect rendered output."""
+        pass
+
 class DiffViewerInterface(ABC):
     @abstractmethod
     def show(self, diffs: List[Tuple]) -> bool:
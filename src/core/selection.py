@@ -0,0 +1,80 @@
+import hashlib
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+
+class RepoSelector:
+    """
+    Decides which repos and templates a run is responsible for.
+
+    Repos are assigned to shards by a stable hash of their name, so every
+    config entry of a repo (one per branch) always lands in the same shard
+    regardless of how the fleet is ordered in values.yml.
+    """
+
+    def __init__(
+        self,
+        shard: Optional[Tuple[int, int]] = None,
+        only: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        only_templates: Optional[Iterable[str]] = None,
+        exclude_templates: Optional[Iterable[str]] = None,
+    ):
+        self.shard = shard
+        self.only = list(only or [])
+        self.exclude = list(exclude or [])
+        self.only_templates = list(only_templates or [])
+        self.exclude_templates = list(exclude_templates or [])
+
+    @staticmethod
+    def parse_shard(value: str) -> Tuple[int, int]:
+        """Parse an `i/N` shard spec (1-based index)."""
+        try:
+            index, count = (int(v) for v in value.split("/", 1))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{value}', expected i/N")
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard '{value}', index must be between 1 and N")
+        return index, count
+
+    @staticmethod
+    def shard_of(repo: str, count: int) -> int:
+        digest = hashlib.sha1(repo.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % count + 1
+
+    @property
+    def filters_templates(self) -> bool:
+        return bool(self.only_templates or self.exclude_templates)
+
+    def owns_repo(self, repo: str) -> bool:
+        """True if the repo belongs to this run's shard, ignoring name filters."""
+        return not self.shard or self.shard_of(repo, self.shard[1]) == self.shard[0]
+
+    def includes_repo(self, repo: str) -> bool:
+        if not self.owns_repo(repo):
+            return False
+        if self.only and not any(re.fullmatch(p, repo) for p in self.only):
+            return False
+        return not any(re.fullmatch(p, repo) for p in self.exclude)
+
+    def includes_template(self, template: str) -> bool:
+        if self.only_templates and not any(re.fullmatch(p, template) for p in self.only_templates):
+            return False
+        return not any(re.fullmatch(p, template) for p in self.exclude_templates)
+
+    def select_repos(self, repos: List) -> List:
+        return [r for r in repos if self.includes_repo(r.name)]
+
+    def partition_path(self, state_file: str) -> str:
+        """Return the state file used by this shard (unchanged when unsharded)."""
+        if not self.shard:
+            return state_file
+        base, ext = os.path.splitext(state_file)
+        return f"{base}.shard-{self.shard[0]}-of-{self.shard[1]}{ext}"
+
+    @staticmethod
+    def partition_shard(path: str) -> Optional[Tuple[int, int]]:
+        """Return the (i, N) shard a partition path belongs to, or None."""
+        match = re.search(r"\.shard-(\d+)-of-(\d+)(\.[^./\\]*)?$", path)
+        return (int(match.group(1)), int(match.group(2))) if match else None
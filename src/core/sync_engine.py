@@ -1,9 +1,16 @@
 import os
+import random
 import re
-from typing import Any
-from src.core.interfaces import ProviderInterface, StateInterface, TemplateInterface, DiffViewerInterface
-from src.utils.logger import Logger
-from src.utils.hash import compute_sha
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set, Tuple
+from src.core.interfaces import ProviderInterface, StateInterface, TemplateInterface, DiffViewerInterface, PushResult
+from src.core.selection import RepoSelector
+from src.progress.events import ProgressReporter, PLAN_BUILT, ITEM_STARTED, ITEM_APPLIED, THROTTLED, FAILED as ITEM_FAILED, RUN_FINISHED
+from src.state.run_manifest import RunManifest, APPLIED, FAILED, PENDING
+from src.template_engine.assets import AssetStore
+from src.utils.logger import Logger, SUMMARY
+from src.utils.hash import compute_sha, compute_git_blob_sha
 
 class SyncEngine:
     def __init__(
@@ -13,7 +20,16 @@ class SyncEngine:
         template_eng: TemplateInterface,
         diff_viewer: DiffViewerInterface,
         interactive: bool = True,
-        provider_name: str = None
+        provider_name: str = None,
+        selector: RepoSelector = None,
+        renderer: Any = None,
+        preflight: bool = True,
+        asset_store: AssetStore = None,
+        cleanup_workers: int = 4,
+        runs_dir: str = None,
+        retries: int = 0,
+        retry_backoff: float = 1.0,
+        progress: ProgressReporter = None
     ):
         self.provider = provider
         self.state_mgr = state_mgr
@@ -21,36 +37,123 @@ class SyncEngine:
         self.diff_viewer = diff_viewer
         self.interactive = interactive  
         self.provider_name = provider_name  
+        self.selector = selector or RepoSelector()
+        self.renderer = renderer
+        self.preflight = preflight
+        self.asset_store = asset_store
+        self.cleanup_workers = cleanup_workers
+        self.runs_dir = runs_dir
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.progress = progress or ProgressReporter()
+        # (repo, branch) -> input digest, recorded with the branch head once applied
+        self._pending_heads = {}
+        # (repo, branch) -> last head whose managed files are known to match state
+        self._base_heads = {}
+        # (repo, branch) -> results of this run's writes, in order
+        self._commits = {}
+        self._meta_dirty = False
 
-    def sync(self, config: Any) -> None:
+    def sync(self, config: Any) -> bool:
+        all_diffs, plan = self.plan(config)
+
+        if not all_diffs:
+            Logger.get_logger().info("Nothing to do.", extra=SUMMARY)
+            if self._record_heads():
+                self.state_mgr.save()
+            return True
+
+        if self.interactive:
+            if not self.diff_viewer.show(all_diffs):
+                Logger.get_logger().info("Aborted.", extra=SUMMARY)
+                return True
+        else:
+            Logger.get_logger().info("Non-interactive mode: Skipping diff viewer.")
+
+        manifest = None
+        if self.runs_dir:
+            manifest = RunManifest.create(self.runs_dir, plan, self._pending_heads, self.provider_name)
+            self.progress.run_id = manifest.run_id
+            Logger.get_logger().info(f"Run {manifest.run_id}: {len(plan)} item(s) planned", extra=SUMMARY)
+        return self.apply(plan, manifest)
+
+    def plan(self, config: Any, targets: Optional[Dict[Tuple[str, str], Optional[Set[str]]]] = None):
+        """
+        Render and compare templates, returning `(all_diffs, plan)`.
+
+        `targets` optionally restricts planning to the given `(repo, branch)`
+        entries; a set value further limits rendering to those templates while
+        the rest of the entry's templates are treated as unchanged.
+        """
         all_diffs = []
         plan = []
+        self._pending_heads = {}
+        self._base_heads = {}
+        self._commits = {}
+        self._meta_dirty = False
+        templates = self.template_eng.list_templates(self.template_eng.root_dir)
+        assets = self.asset_store.list_assets() if self.asset_store else []
+        # Pattern tuples are interned by the config loader, so most repos share one entry.
+        selections = {}
 
-        for repo_cfg in config.repos:
-            merged_vars = repo_cfg.vars or {}
-            patterns = repo_cfg.templates or []
-            templates = self.template_eng.list_templates(self.template_eng.root_dir)
-            selected = [t for t in templates if any(re.fullmatch(p, t) for p in patterns)]
+        # First pass: decide what to render or upload for every repo entry.
+        entries = []
+        for repo_cfg in self.selector.select_repos(config.repos):
+            if targets is not None and (repo_cfg.name, repo_cfg.branch) not in targets:
+                continue
+            only = targets.get((repo_cfg.name, repo_cfg.branch)) if targets is not None else None
+            patterns = (tuple(repo_cfg.templates or ()), tuple(repo_cfg.assets or ()))
+            selected = selections.get(patterns)
+            if selected is None:
+                selected = selections[patterns] = (
+                    [t for t in templates if any(re.fullmatch(p, t) for p in patterns[0])]
+                    + ([AssetStore.key(a) for a in self.asset_store.select(assets, patterns[1])] if patterns[1] else [])
+                )
 
             if not selected:
                 Logger.get_logger().warning(f"No templates matched for {repo_cfg.name}")
                 continue
 
-            branch = repo_cfg.branch
-            message = repo_cfg.message
-            path_root = repo_cfg.path
-
-            if not (branch and message and path_root):
+            if not (repo_cfg.branch and repo_cfg.message and repo_cfg.path):
                 Logger.get_logger().error(f"Missing required fields in config for repo '{repo_cfg.name}'")
                 raise ValueError(f"Missing required fields in config for repo '{repo_cfg.name}'")
 
-            synced_keys = []
+            # Templates filtered out of this run are still desired by the config,
+            # so they count as synced and their files survive cleanup.
+            pending = [k for k in selected if self.selector.includes_template(k) and (only is None or k in only)]
+            synced_keys = [k for k in selected if k not in pending]
+            complete = only is None and not self.selector.filters_templates
+            entries.append((repo_cfg, pending, synced_keys, complete))
 
-            for tmpl in selected:
-                content = self.template_eng.render(tmpl, merged_vars)
-                target_path = os.path.join(path_root, tmpl.rsplit('.', 1)[0])
-                key = tmpl
-                current_sha = compute_sha(content)
+        forced = self._preflight(entries) if self.preflight and entries else {}
+
+        # Render everything in one batch so it can be spread across processes;
+        # results come back in job order.
+        jobs = [(key, repo_cfg.vars or {}) for repo_cfg, pending, _, _ in entries
+                for key in pending if not AssetStore.is_key(key)]
+        contents = iter(self._render_all(jobs))
+
+        # Second pass: compare against state in config order, collecting the
+        # keys each planned (repo, branch) still wants.
+        keep = {}
+        for repo_cfg, pending, synced_keys, _ in entries:
+            branch = repo_cfg.branch
+            drifted = forced.get((repo_cfg.name, branch), set())
+            message = repo_cfg.message
+            path_root = repo_cfg.path
+
+            for key in pending:
+                if AssetStore.is_key(key):
+                    name = AssetStore.name(key)
+                    content = None
+                    source = self.asset_store.path(name)
+                    target_path = os.path.join(path_root, name)
+                    current_sha = self.asset_store.sha(name)
+                else:
+                    content = next(contents)
+                    source = None
+                    target_path = os.path.join(path_root, key.rsplit('.', 1)[0])
+                    current_sha = compute_sha(content)
 
                 existing_entry = self.state_mgr.get_file_entry(repo_cfg.name, branch, key, self.provider_name)
                 previous_sha = existing_entry.get("sha")
@@ -58,9 +161,11 @@ class SyncEngine:
 
                 synced_keys.append(key)
 
-                if current_sha == previous_sha:
+                if current_sha == previous_sha and key not in drifted:
                     Logger.get_logger().info(f"{repo_cfg.name}:{branch} [{target_path}] Skipped (unchanged)")
                     continue
+                if key in drifted:
+                    Logger.get_logger().warning(f"{repo_cfg.name}:{branch} [{target_path}] Changed on remote, restoring")
 
                 action = "update" if previous_sha else "create"
                 all_diffs.append((repo_cfg.name, branch, action, target_path, previous_content, content))
@@ -70,84 +175,330 @@ class SyncEngine:
                     branch=branch,
                     path=target_path,
                     content=content,
+                    source=source,
                     message=message,
                     key=key,
                     op=action,
-                    sha=current_sha
+                    sha=current_sha,
+                    base_sha=previous_sha
                 ))
 
-            self._handle_old_files(repo_cfg, synced_keys, all_diffs, plan, config)
+            keep.setdefault(repo_cfg.name, {}).setdefault(branch, set()).update(synced_keys)
 
-        if not all_diffs:
-            Logger.get_logger().info("Nothing to do.")
-            return
+        self._plan_deletions(keep, all_diffs, plan, config)
+        return all_diffs, plan
 
-        if self.interactive:
-            if not self.diff_viewer.show(all_diffs):
-                Logger.get_logger().info("Aborted.")
-                return
-        else:
-            Logger.get_logger().info("Non-interactive mode: Skipping diff viewer.")
+    def _inputs_digest(self, repo_cfg, fingerprint: str) -> str:
+        return compute_sha(f"{repo_cfg.digest}:{fingerprint}")
 
-        for item in plan:
-            if item["op"] == "delete":
-                self.provider.delete(
-                    repo=item["repo"],
-                    branch=item["branch"],
-                    path=item["path"],
-                    commit_message=item["message"]
-                )
-            else:
-                sha = self.provider.sync(
-                    repo=item["repo"],
-                    branch=item["branch"],
-                    path=item["path"],
-                    content=item["content"],
-                    commit_message=item["message"],
-                )
+    def _preflight(self, entries):
+        """
+        Skip entries whose inputs and branch head are unchanged since the last
+        apply. Entries whose head moved only re-verify their managed paths;
+        returns the drifted template keys per (repo, branch), which must be
+        pushed again even if their rendered content is unchanged.
+        """
+        fingerprint = self.template_eng.fingerprint()
+        if self.asset_store:
+            fingerprint += self.asset_store.fingerprint()
+        candidates = {}
+        for idx, (repo_cfg, _, _, complete) in enumerate(entries):
+            ref = (repo_cfg.name, repo_cfg.branch)
+            inputs = self._inputs_digest(repo_cfg, fingerprint)
+            if complete:
+                self._pending_heads[ref] = inputs
+            meta = self.state_mgr.get_branch_meta(repo_cfg.name, repo_cfg.branch, self.provider_name)
+            self._base_heads[ref] = meta.get("head")
+            # A missing head means the files were never verified remotely.
+            if meta.get("inputs") == inputs:
+                candidates[idx] = meta.get("head")
+
+        refs = [(entries[i][0].name, entries[i][0].branch) for i in candidates]
+        heads = self.provider.get_branch_heads(refs) if refs else {}
+        forced = {}
+        for idx, known_head in candidates.items():
+            repo_cfg, pending, synced_keys, complete = entries[idx]
+            ref = (repo_cfg.name, repo_cfg.branch)
+            head = heads.get(ref)
+            if head is None:
+                continue
 
+            if head == known_head:
+                drifted = set()
+                Logger.get_logger().info(f"{repo_cfg.name}:{repo_cfg.branch} Skipped (head and inputs unchanged)")
+            else:
+                drifted = self._verify_files(repo_cfg, pending)
+                if drifted is None:
+                    continue
+                if not drifted:
+                    # Only a head whose managed files were compared is recorded.
+                    self.state_mgr.update_branch_meta(repo_cfg.name, repo_cfg.branch, self.provider_name, head=head)
+                    self._meta_dirty = True
                 Logger.get_logger().info(
-                    f"{item['repo']} ({item['branch']})/{item['path']} [{item['op']}]"
+                    f"{repo_cfg.name}:{repo_cfg.branch} Head moved, {len(drifted)} managed file(s) changed on remote"
                 )
 
-                if item["key"]:
-                    self.state_mgr.update_file_entry(
-                        repo=item["repo"],
-                        branch=item["branch"],
-                        key=item["key"],
-                        file_path=item["path"],
-                        sha=item["sha"],
-                        rendered=item["content"],
-                        provider_name=self.provider_name,
+            # The head matches state except for drifted files, which are pushed.
+            self._base_heads[ref] = head
+            # Unchanged inputs produce what is already in state, so only
+            # drifted files need rendering or uploading again.
+            entries[idx] = (
+                repo_cfg,
+                [k for k in pending if k in drifted],
+                synced_keys + [k for k in pending if k not in drifted],
+                complete,
+            )
+            forced[ref] = drifted
+            if not drifted:
+                self._pending_heads.pop(ref, None)
+        return forced
+
+    def _verify_files(self, repo_cfg, keys) -> Optional[Set[str]]:
+        """
+        Compare remote blob SHAs of managed files with what was last pushed.
+        Returns the keys that differ, or None if the provider can't tell.
+        """
+        files = {k: self.state_mgr.get_file_entry(repo_cfg.name, repo_cfg.branch, k, self.provider_name) for k in keys}
+        paths = [f["path"] for f in files.values() if f.get("path")]
+        remote = self.provider.get_blob_shas(repo_cfg.name, repo_cfg.branch, paths) if paths else {}
+        if paths and not remote:
+            return None
+
+        drifted = set()
+        for key, entry in files.items():
+            expected = entry.get("blob_sha")
+            if not expected and entry.get("rendered") is not None:
+                expected = compute_git_blob_sha(entry["rendered"])
+            if not entry.get("path") or expected is None or remote.get(entry["path"]) != expected:
+                drifted.add(key)
+        return drifted
+
+    def _record_heads(self) -> bool:
+        """
+        Store the input digest of every fully planned branch, with a head the
+        next run's preflight can trust. Returns True if state changed.
+
+        The head is the commit of this run's last write, provided the writes
+        form an unbroken chain on top of a verified head; without writes it is
+        the verified head itself. Otherwise, e.g. someone pushed in between,
+        no head is stored and the next run verifies the files instead.
+        """
+        dirty, self._meta_dirty = self._meta_dirty, False
+        for ref, inputs in self._pending_heads.items():
+            head = self._base_heads.get(ref)
+            for result in self._commits.get(ref, []):
+                if isinstance(result, PushResult) and result.commit is None:
+                    continue
+                if not isinstance(result, PushResult) or head is None or result.parent != head:
+                    head = None
+                    break
+                head = result.commit
+            meta = self.state_mgr.get_branch_meta(ref[0], ref[1], self.provider_name)
+            if meta.get("head") != head or meta.get("inputs") != inputs:
+                self.state_mgr.update_branch_meta(ref[0], ref[1], self.provider_name, head=head, inputs=inputs)
+                dirty = True
+        self._pending_heads = {}
+        return dirty
+
+    def _render_all(self, jobs):
+        if self.renderer is not None and len(jobs) > 1:
+            return self.renderer.render_many(jobs)
+        return (self.template_eng.render(tmpl, vars) for tmpl, vars in jobs)
+
+    def apply(self, plan, manifest: RunManifest = None) -> bool:
+        """
+        Push every item of the plan, recording per-item status in `manifest`
+        when given. A failed item doesn't stop the run; state is saved even
+        if something goes wrong. Returns True if every item was applied.
+        """
+        failed = []
+        todo = [idx for idx in range(len(plan)) if not (manifest and manifest.status(idx) == APPLIED)]
+        self.progress.emit(PLAN_BUILT, items=len(todo), planned=len(plan))
+        try:
+            for idx, item in enumerate(plan):
+                if item["op"] == "delete" or (manifest and manifest.status(idx) == APPLIED):
+                    continue
+                if not self._attempt(idx, item, self._apply_item, manifest):
+                    failed.append(item)
+
+            deletions = [(idx, item) for idx, item in enumerate(plan)
+                         if item["op"] == "delete" and not (manifest and manifest.status(idx) == APPLIED)]
+            failed.extend(self._apply_deletions(deletions, manifest))
+
+            for item in failed:
+                self._pending_heads.pop((item["repo"], item["branch"]), None)
+            self._record_heads()
+        finally:
+            self.state_mgr.save()
+            self.progress.emit(RUN_FINISHED, applied=len(todo) - len(failed), failed=len(failed))
+
+        if failed:
+            hint = f" Re-run with --resume {manifest.run_id} to retry them." if manifest else ""
+            Logger.get_logger().error(f"Sync finished with {len(failed)} failed item(s).{hint}")
+            return False
+
+        if manifest:
+            manifest.remove()
+        Logger.get_logger().info("Sync complete.", extra=SUMMARY)
+        return True
+
+    def resume(self, manifest: RunManifest) -> bool:
+        """Re-apply the failed and pending items of an earlier run, without re-planning."""
+        counts = manifest.counts()
+        Logger.get_logger().info(
+            f"Resuming run {manifest.run_id}: {counts[APPLIED]} applied, "
+            f"{counts[FAILED]} failed, {counts[PENDING]} pending",
+            extra=SUMMARY,
+        )
+        self._pending_heads = dict(manifest.heads)
+        # Earlier attempts may have committed already; heads get re-verified.
+        self._base_heads = {}
+        self._commits = {}
+        self.progress.run_id = manifest.run_id
+        self._meta_dirty = False
+        return self.apply(manifest.items, manifest)
+
+    def _attempt(self, idx, item, action, manifest) -> bool:
+        for attempt in range(self.retries + 1):
+            self.progress.emit(ITEM_STARTED, item, attempt=attempt + 1)
+            try:
+                result = action(item)
+            except Exception as e:
+                if attempt < self.retries:
+                    delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+                    Logger.get_logger().warning(
+                        f"{item['repo']} ({item['branch']})/{item['path']} failed: {e}; retrying in {delay:.1f}s"
                     )
+                    self.progress.emit(THROTTLED, item, delay=round(delay, 2), error=str(e))
+                    time.sleep(delay)
+                    continue
+                Logger.get_logger().error(f"{item['repo']} ({item['branch']})/{item['path']} [{item['op']}] failed: {e}")
+                if manifest:
+                    manifest.mark(idx, FAILED, error=str(e), attempts=attempt + 1)
+                self.progress.emit(ITEM_FAILED, item, error=str(e), attempts=attempt + 1)
+                return False
+            if manifest:
+                manifest.mark(idx, APPLIED, **(result or {}))
+            self.progress.emit(ITEM_APPLIED, item, **(result or {}))
+            return True
+
+    def _apply_item(self, item) -> dict:
+        if "base_sha" in item:
+            # On resume, a later run may have synced this file already; never
+            # push older content over it.
+            current = self.state_mgr.get_file_entry(item["repo"], item["branch"], item["key"], self.provider_name).get("sha")
+            if current == item["sha"]:
+                Logger.get_logger().info(f"{item['repo']} ({item['branch']})/{item['path']} Skipped (already in state)")
+                return None
+            if current != item["base_sha"]:
+                raise RuntimeError(f"{item['path']} was synced by a later run; start a new sync instead")
+        if item.get("source"):
+            # Assets are uploaded from disk; refuse to push bytes that no
+            # longer match what was planned (e.g. on resume).
+            if self.asset_store and self.asset_store.sha(AssetStore.name(item["key"])) != item["sha"]:
+                raise RuntimeError(f"{item['source']} changed since the run was planned")
+            result = self.provider.sync_file(
+                repo=item["repo"],
+                branch=item["branch"],
+                path=item["path"],
+                source=item["source"],
+                commit_message=item["message"],
+            )
+        else:
+            result = self.provider.sync(
+                repo=item["repo"],
+                branch=item["branch"],
+                path=item["path"],
+                content=item["content"],
+                commit_message=item["message"],
+            )
+
+        Logger.get_logger().info(
+            f"{item['repo']} ({item['branch']})/{item['path']} [{item['op']}]"
+        )
+
+        self._commits.setdefault((item["repo"], item["branch"]), []).append(result)
+        if isinstance(result, PushResult):
+            blob_sha = result.blob_sha
+        else:
+            # Providers that return a bare blob SHA don't report their commit
+            blob_sha = result if isinstance(result, str) else None
+        if item["key"]:
+            # Assets keep only their hashes in state, never their bytes.
+            self.state_mgr.update_file_entry(
+                repo=item["repo"],
+                branch=item["branch"],
+                key=item["key"],
+                file_path=item["path"],
+                sha=item["sha"],
+                rendered=item["content"],
+                provider_name=self.provider_name,
+                blob_sha=blob_sha,
+            )
+        return {"blob_sha": blob_sha} if blob_sha else None
+
+    def _delete_item(self, item) -> None:
+        result = self.provider.delete_many(
+            repo=item["repo"],
+            branch=item["branch"],
+            paths=item["paths"],
+            commit_message=item["message"]
+        )
+        self._commits.setdefault((item["repo"], item["branch"]), []).append(result)
+        self.state_mgr.remove_file_entries(item["repo"], item["branch"], item.get("keys", []), self.provider_name)
+
+    def _apply_deletions(self, deletions, manifest):
+        """Apply delete items, returning the ones that failed."""
+        # Each item is a distinct (repo, branch) and runs after all pushes, so
+        # items never race each other or a push on the same ref.
+        def delete(entry):
+            idx, item = entry
+            return None if self._attempt(idx, item, self._delete_item, manifest) else item
 
-        self.state_mgr.save()
-        Logger.get_logger().info("Sync complete.")
-
-    def _handle_old_files(self, repo_cfg, synced_keys, all_diffs, plan, config):
-        old_files = self.state_mgr.cleanup_old(repo_cfg.name, repo_cfg.branch, synced_keys, self.provider_name)
-        for p in old_files:
-            all_diffs.append((repo_cfg.name, repo_cfg.branch, 'delete', p, None, None))
-            plan.append(dict(
-                repo=repo_cfg.name,
-                branch=repo_cfg.branch,
-                path=p,
-                content=None,
-                message=f"remove {p}",
-                key=None,
-                op='delete'
-            ))
-
-        active_branches = {r.branch for r in config.repos if r.name == repo_cfg.name}
-        old_branch_files = self.state_mgr.cleanup_old_branches(repo_cfg.name, active_branches, self.provider_name)
-        for branch_name, path in old_branch_files:
-            all_diffs.append((repo_cfg.name, branch_name, 'delete', path, None, None))
-            plan.append(dict(
-                repo=repo_cfg.name,
-                branch=branch_name,
-                path=path,
-                content=None,
-                message=f"remove {path} from old branch {branch_name}",
-                key=None,
-                op='delete'
-            ))
\ No newline at end of file
+        if len(deletions) > 1 and self.cleanup_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.cleanup_workers) as pool:
+                results = list(pool.map(delete, deletions))
+        else:
+            results = [delete(entry) for entry in deletions]
+        return [item for item in results if item is not None]
+
+    def _plan_deletions(self, keep, all_diffs, plan, config):
+        """
+        Plan cleanup once per repo: everything tracked for the repo that is not
+        wanted anymore, grouped into one delete item per branch.
+        """
+        # Use the full fleet, not just this run's selection, so branches of a
+        # repo handled by other config entries are never treated as stale.
+        active_branches = {}
+        for r in config.repos:
+            active_branches.setdefault(r.name, set()).add(r.branch)
+
+        for repo, branch_keys in keep.items():
+            # State keeps the entries until the deletion succeeds, so a failed
+            # cleanup is planned again by the next run.
+            stale = self.state_mgr.stale_files(repo, branch_keys, active_branches.get(repo, set()), self.provider_name)
+            by_branch = {}
+            for branch, key, path in stale:
+                keys, paths = by_branch.setdefault(branch, ([], []))
+                keys.append(key)
+                if path:
+                    paths.append(path)
+
+            for branch, (keys, paths) in by_branch.items():
+                if not paths:
+                    continue
+                old_branch = branch not in active_branches.get(repo, set())
+                for path in paths:
+                    all_diffs.append((repo, branch, 'delete', path, None, None))
+                target = paths[0] if len(paths) == 1 else f"{len(paths)} files"
+                plan.append(dict(
+                    repo=repo,
+                    branch=branch,
+                    path=paths[0],
+                    paths=paths,
+                    keys=keys,
+                    content=None,
+                    message=f"remove {target} from old branch {branch}" if old_branch else f"remove {target}",
+                    key=None,
+                    op='delete'
+                ))
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+from src.config.loader import FRAGMENTS_DIR
+from src.core.sync_engine import SyncEngine
+from src.template_engine.assets import ASSETS_DIR, AssetStore
+from src.template_engine.jinja_loader import HELPERS_TEMPLATE
+from src.utils.logger import Logger
+
+Targets = Dict[Tuple[str, str], Optional[Set[str]]]
+
+
+class WatchSession:
+    """
+    Keeps config, templates and state warm and re-plans only the
+    (repo, branch, template) combinations affected by a changed file.
+    """
+
+    def __init__(self, engine: SyncEngine, values_path: str, load_config: Callable, auto_apply: bool = False):
+        self.engine = engine
+        self.values_path = os.path.abspath(values_path)
+        self.fragments_dir = os.path.join(os.path.dirname(self.values_path), FRAGMENTS_DIR)
+        self.load_config = load_config
+        self.auto_apply = auto_apply
+        self.root_dir = os.path.abspath(engine.template_eng.root_dir)
+        self.includes_dir = os.path.join(self.root_dir, "includes")
+        self.assets_dir = os.path.join(self.root_dir, ASSETS_DIR)
+        self.config = load_config(values_path)
+
+    def start(self) -> None:
+        """Plan the whole fleet once, warming the template cache and dependency map."""
+        self._run(None)
+
+    def on_change(self, paths: Set[str]) -> None:
+        targets = self.affected(paths)
+        if targets is None or targets:
+            self._run(targets)
+
+    def affected(self, paths: Set[str]) -> Optional[Targets]:
+        """
+        Map changed files to plan targets. Returns None when everything must
+        be re-planned and an empty dict when nothing is affected.
+        """
+        targets: Targets = {}
+        template_names = set()
+        asset_names = set()
+        values_changed = False
+        for path in map(os.path.abspath, paths):
+            if path == self.values_path or (os.path.dirname(path) == self.fragments_dir and path.endswith((".yml", ".yaml"))):
+                values_changed = True
+            elif path.startswith(self.assets_dir + os.sep):
+                asset_names.add(os.path.relpath(path, self.assets_dir).replace(os.sep, "/"))
+            elif path.startswith(self.root_dir + os.sep) and not self.engine.template_eng.ignores(path):
+                name = os.path.relpath(path, self.root_dir).replace(os.sep, "/")
+                if path.startswith(self.includes_dir + os.sep):
+                    if os.path.relpath(path, self.includes_dir) == HELPERS_TEMPLATE:
+                        self.engine.template_eng.reload_helpers()
+                        return None
+                    # Includes resolve both relative to includes/ and to the root
+                    dependents = self._dependents(os.path.relpath(path, self.includes_dir).replace(os.sep, "/"))
+                    dependents |= self._dependents(name)
+                else:
+                    dependents = self._dependents(name)
+                if os.path.dirname(path) == self.root_dir and path.endswith(".j2"):
+                    dependents.add(name)
+                if not dependents:
+                    # Possibly read by a template that hasn't rendered yet (or failed to)
+                    return None
+                template_names |= dependents
+
+        if values_changed:
+            self._reload_config(targets)
+
+        for repo_cfg in self.config.repos:
+            key = (repo_cfg.name, repo_cfg.branch)
+            if key in targets and targets[key] is None:
+                continue
+            hits = {t for t in template_names if any(re.fullmatch(p, t) for p in repo_cfg.templates or [])}
+            hits |= {AssetStore.key(a) for a in asset_names if any(re.fullmatch(p, a) for p in repo_cfg.assets or [])}
+            if hits:
+                targets.setdefault(key, set()).update(hits)
+        return targets
+
+    def _dependents(self, name: str) -> Set[str]:
+        return {t for t, deps in self.engine.template_eng.dependencies.items() if name in deps}
+
+    def _reload_config(self, targets: Targets) -> None:
+        try:
+            new_config = self.load_config(self.values_path)
+        except Exception as e:
+            Logger.get_logger().error(f"Failed to reload {self.values_path}: {e}")
+            return
+        old = {(r.name, r.branch): r for r in self.config.repos}
+        new = {(r.name, r.branch): r for r in new_config.repos}
+        self.config = new_config
+
+        changed_repos = {key[0] for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+        # Re-plan every remaining entry of a touched repo so branch cleanup sees the full picture.
+        for key in new:
+            if key[0] in changed_repos:
+                targets[key] = None
+
+    def _run(self, targets: Optional[Targets]) -> None:
+        started = time.perf_counter()
+        try:
+            all_diffs, plan = self.engine.plan(self.config, targets)
+        except Exception as e:
+            Logger.get_logger().error(f"Planning failed: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        scope = "all repos" if targets is None else f"{len(targets)} repo entr{'y' if len(targets) == 1 else 'ies'}"
+        Logger.get_logger().info(f"Planned {scope} in {elapsed_ms:.1f} ms: {len(all_diffs)} change(s)")
+        for repo, branch, op, path, _, _ in all_diffs:
+            Logger.get_logger().info(f"  {repo} ({branch})/{path} [{op}]")
+
+        if self.auto_apply and plan:
+            self.engine.apply(plan)
@@ -3,7 +3,8 @@ from rich.console import Console
 from rich.text import Text
 
 def main():
-    console = Console()
+    # stderr, like the logs, so stdout stays clean for `--events-file -`
+    console = Console(stderr=True)
 
     header = Text("Git-Pilot", style="bold dark_orange underline")
     subheader = Text(" — Sync workflows, configs, and more across 10+ repos in seconds!", style="light_salmon1")
@@ -12,6 +13,6 @@ def main():
     console.print(header.append(subheader))
     console.print("\n" * 1) 
 
-    parser = ParserBuilder().with_init_command().with_sync_command().build()
+    parser = ParserBuilder().with_init_command().with_sync_command().with_watch_command().with_state_command().build()
     args = parser.parse_args()
     args.command.execute(args)
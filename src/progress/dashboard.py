@@ -0,0 +1,127 @@
+import sys
+import time
+from collections import OrderedDict
+from rich.console import Console, Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+from src.utils.logger import Logger
+from src.progress.events import (
+    ProgressEvent, ProgressSink, PLAN_BUILT, ITEM_STARTED, ITEM_APPLIED, THROTTLED, FAILED, RUN_FINISHED
+)
+
+
+class RichDashboard(ProgressSink):
+    """
+    Live terminal view of an apply: throughput, ETA, in-flight requests,
+    API rate-limit headroom and the status of the most recently active repos.
+    """
+
+    def __init__(self, rate_limit=None, console: Console = None, max_repos: int = 12):
+        self.console = console or Console(stderr=True)
+        self.rate_limit = rate_limit
+        self.max_repos = max_repos
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.started_at = None
+        self.repos = OrderedDict()
+        self._live = None
+        self._log_stream = None
+
+    def handle(self, event: ProgressEvent) -> None:
+        if event.type == PLAN_BUILT:
+            self.total = event.data.get("items", 0)
+            self.started_at = time.monotonic()
+            if self._live is None and self.total:
+                self._live = Live(self._render(), console=self.console, refresh_per_second=4, transient=False)
+                self._live.start()
+                # Live proxies sys.stderr; route log lines through it so they
+                # print above the dashboard instead of tearing it.
+                self._log_stream = Logger.set_stream(sys.stderr)
+            return
+
+        if event.type == ITEM_STARTED:
+            self.in_flight += 1
+            self._set_repo(event, "[yellow]applying[/yellow]")
+        elif event.type == ITEM_APPLIED:
+            self.in_flight -= 1
+            self.done += 1
+            self._set_repo(event, "[green]applied[/green]")
+        elif event.type == FAILED:
+            self.in_flight -= 1
+            self.done += 1
+            self.failed += 1
+            self._set_repo(event, "[red]failed[/red]")
+        elif event.type == THROTTLED:
+            self.in_flight -= 1
+            self.throttled += 1
+            self._set_repo(event, f"[magenta]retrying in {event.data.get('delay', 0):.1f}s[/magenta]")
+        elif event.type == RUN_FINISHED:
+            self.close()
+            return
+
+        if self._live is not None:
+            self._live.update(self._render())
+
+    def _set_repo(self, event: ProgressEvent, status: str) -> None:
+        key = f"{event.repo} ({event.branch})"
+        self.repos.pop(key, None)
+        self.repos[key] = f"{status} {event.path or ''}"
+        while len(self.repos) > self.max_repos:
+            self.repos.popitem(last=False)
+
+    def _render(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        rate = self.done / elapsed if elapsed > 0 else 0
+        eta = (self.total - self.done) / rate if rate > 0 else None
+
+        stats = Table.grid(padding=(0, 2))
+        stats.add_row(
+            f"[bold]{self.done}[/bold]/{self.total} items",
+            f"{rate:.1f} items/s",
+            f"ETA {self._format_seconds(eta)}",
+            f"in flight {max(self.in_flight, 0)}",
+            f"[red]{self.failed} failed[/red]" if self.failed else "0 failed",
+            f"rate limit {self._headroom()}",
+        )
+
+        repos = Table(expand=True, show_edge=False, box=None)
+        repos.add_column("Repo")
+        repos.add_column("Status")
+        for repo, status in reversed(self.repos.items()):
+            repos.add_row(repo, status)
+
+        # ProgressBar doesn't end its line; a grid row gives it one
+        bar = Table.grid(expand=True)
+        bar.add_row(ProgressBar(total=max(self.total, 1), completed=self.done))
+        return Panel(Group(bar, stats, repos), title="git-pilot sync", border_style="bright_blue")
+
+    def _headroom(self) -> str:
+        if not self.rate_limit:
+            return "n/a"
+        quota = self.rate_limit()
+        if not quota:
+            return "n/a"
+        remaining, limit = quota
+        return f"{remaining}/{limit}"
+
+    @staticmethod
+    def _format_seconds(seconds) -> str:
+        if seconds is None:
+            return "--:--"
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+    def close(self) -> None:
+        if self._live is not None:
+            self._live.update(self._render())
+            self._live.stop()
+            self._live = None
+            if self._log_stream is not None:
+                Logger.set_stream(self._log_stream)
+                self._log_stream = None
@@ -0,0 +1,73 @@
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+PLAN_BUILT = "plan-built"
+ITEM_STARTED = "item-started"
+ITEM_APPLIED = "item-applied"
+THROTTLED = "throttled"
+FAILED = "failed"
+RUN_FINISHED = "run-finished"
+
+
+@dataclass
+class ProgressEvent:
+    type: str
+    ts: float = field(default_factory=time.time)
+    run_id: Optional[str] = None
+    repo: Optional[str] = None
+    branch: Optional[str] = None
+    path: Optional[str] = None
+    op: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if v not in (None, {})}
+
+
+class ProgressSink:
+    def handle(self, event: ProgressEvent) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ProgressReporter:
+    """
+    Fans progress events out to sinks. Safe to call from worker threads;
+    with no sinks attached, emitting is a no-op.
+    """
+
+    def __init__(self, sinks: List[ProgressSink] = None):
+        self.sinks = list(sinks or [])
+        self.run_id = None
+        self._lock = threading.Lock()
+
+    def emit(self, type: str, item: dict = None, **data) -> None:
+        if not self.sinks:
+            return
+        item = item or {}
+        event = ProgressEvent(
+            type=type,
+            run_id=self.run_id,
+            repo=item.get("repo"),
+            branch=item.get("branch"),
+            path=item.get("path"),
+            op=item.get("op"),
+            data=data,
+        )
+        with self._lock:
+            for sink in self.sinks:
+                sink.handle(event)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,23 @@
+import json
+from src.progress.events import ProgressEvent, ProgressSink
+
+
+class JsonLinesSink(ProgressSink):
+    """Writes one JSON object per event, flushed so consumers can tail the file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a") if path != "-" else None
+
+    def handle(self, event: ProgressEvent) -> None:
+        line = json.dumps(event.to_dict(), separators=(",", ":"))
+        if self._file is None:
+            print(line, flush=True)
+            return
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,13 +1,107 @@
-from typing import Any, List, Tuple, Optional
-from github import Github
-from src.core.interfaces import ProviderInterface
+import base64
+import os
+from typing import Any, Dict, Iterator, List, Tuple, Optional
+import requests
+from github import Github, InputGitTreeElement, UnknownObjectException
+from src.core.interfaces import ProviderInterface, PushResult
+from src.utils.hash import compute_file_git_blob_sha, iter_file_chunks
 from src.utils.logger import Logger
 
 
+# Aliased sub-queries per GraphQL request; keeps each request well under
+# GitHub's node and complexity limits.
+GRAPHQL_BATCH_SIZE = 50
+
+# Raw bytes per base64 chunk when streaming blobs; a multiple of 3 so chunks
+# encode without padding and can be concatenated.
+BLOB_CHUNK_SIZE = 3 * 256 * 1024
+
+# (connect, read) seconds for blob uploads, so a stalled upload fails instead of hanging
+BLOB_UPLOAD_TIMEOUT = (30, 300)
+
+
 class GitHubProvider(ProviderInterface):
     def __init__(self, token: str):
+        self.token = token
         self.client = Github(token)
 
+    def _graphql(self, query: str, variables: dict) -> dict:
+        # graphql_query raises if any alias failed (e.g. one missing repo in a
+        # batch); failed aliases come back as null, so keep the partial data.
+        requester = self.client.requester
+        _, data = requester.requestJsonAndCheck("POST", requester.graphql_url, input={"query": query, "variables": variables})
+        errors = data.get("errors") or []
+        if data.get("data") is None:
+            raise RuntimeError("; ".join(e.get("message", str(e)) for e in errors) or "empty GraphQL response")
+        for error in errors:
+            path = ".".join(str(p) for p in error.get("path") or [])
+            Logger.get_logger().debug(f"GraphQL error at {path or '?'}: {error.get('message')}")
+        return data["data"]
+
+    def get_rate_limit(self) -> Optional[Tuple[int, int]]:
+        # Read from the last response headers; `client.rate_limiting` would
+        # issue a request when nothing has been fetched yet.
+        remaining, limit = self.client.requester.rate_limiting
+        if limit < 0:
+            return None
+        return remaining, limit
+
+    def get_branch_heads(self, refs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Fetch head commit SHAs for many (repo, branch) pairs with one GraphQL
+        request per batch. Pairs that can't be resolved (missing repo or
+        branch) map to None; pairs in a failed batch are left out.
+        """
+        heads = {}
+        refs = list(dict.fromkeys(refs))
+        for start in range(0, len(refs), GRAPHQL_BATCH_SIZE):
+            batch = refs[start:start + GRAPHQL_BATCH_SIZE]
+            params, fields, variables = [], [], {}
+            for i, (repo, branch) in enumerate(batch):
+                owner, name = repo.split("/", 1)
+                params.append(f"$o{i}: String!, $n{i}: String!, $b{i}: String!")
+                fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ref(qualifiedName: $b{i}) {{ target {{ oid }} }} }}")
+                variables.update({f"o{i}": owner, f"n{i}": name, f"b{i}": f"refs/heads/{branch}"})
+            query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+            try:
+                data = self._graphql(query, variables)
+            except Exception as e:
+                Logger.get_logger().warning(f"Failed to fetch branch heads for {len(batch)} repo(s): {e}")
+                continue
+            for i, ref in enumerate(batch):
+                node = (data.get(f"r{i}") or {}).get("ref") or {}
+                heads[ref] = (node.get("target") or {}).get("oid")
+        return heads
+
+    def get_blob_shas(self, repo: str, branch: str, paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch the blob SHA of each path on `branch` without downloading contents.
+        """
+        owner, name = repo.split("/", 1)
+        shas = {}
+        paths = list(dict.fromkeys(paths))
+        for start in range(0, len(paths), GRAPHQL_BATCH_SIZE):
+            batch = paths[start:start + GRAPHQL_BATCH_SIZE]
+            params = ["$owner: String!", "$name: String!"]
+            fields = []
+            variables = {"owner": owner, "name": name}
+            for i, path in enumerate(batch):
+                params.append(f"$e{i}: String!")
+                fields.append(f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ oid }} }}")
+                variables[f"e{i}"] = f"{branch}:{path}"
+            query = f"query({', '.join(params)}) {{ repository(owner: $owner, name: $name) {{ {' '.join(fields)} }} }}"
+            try:
+                data = self._graphql(query, variables).get("repository")
+            except Exception as e:
+                Logger.get_logger().warning(f"Failed to verify files in {repo} ({branch}): {e}")
+                return {}
+            if data is None:
+                Logger.get_logger().warning(f"Failed to verify files in {repo} ({branch}): repository not found")
+                return {}
+            for i, path in enumerate(batch):
+                shas[path] = (data.get(f"f{i}") or {}).get("oid")
+        return shas
+
     def sync(
         self,
         repo: str,
@@ -15,12 +109,10 @@ class GitHubProvider(ProviderInterface):
         path: str,
         content: str,
         commit_message: str,
-    ) -> Tuple[List[Tuple[str, str, str, Any, Any]], Optional[str]]:
+    ) -> PushResult:
         """
-        Uploads a file to GitHub and returns:
-            - SHA of the committed file
+        Uploads a file to GitHub through the contents API.
         """
-        sha = None
         repository = self.client.get_repo(repo)
         Logger.get_logger().debug(f"Processing {repo} on branch {branch}...")
 
@@ -28,14 +120,73 @@ class GitHubProvider(ProviderInterface):
             contents = repository.get_contents(path, ref=branch)
             sha = contents.sha
             res = repository.update_file(path, commit_message, content, sha, branch=branch)
-            sha = res["content"].sha
             Logger.get_logger().debug(f"  - Updated {path}")
         except Exception:
             res = repository.create_file(path, commit_message, content, branch=branch)
-            sha = res["content"].sha
             Logger.get_logger().debug(f"  - Created {path}")
 
-        return sha
+        commit = res["commit"]
+        return PushResult(
+            blob_sha=res["content"].sha,
+            commit=commit.sha,
+            parent=commit.parents[0].sha if commit.parents else None,
+        )
+
+    def sync_file(
+        self,
+        repo: str,
+        branch: str,
+        path: str,
+        source: str,
+        commit_message: str,
+    ) -> PushResult:
+        """
+        Uploads a local file through the git data API: the blob is streamed
+        from disk, then committed with a single-entry tree on top of the
+        branch head.
+        """
+        blob_sha = compute_file_git_blob_sha(source)
+        if self.get_blob_shas(repo, branch, [path]).get(path) == blob_sha:
+            Logger.get_logger().debug(f"  - {path} already up to date")
+            return PushResult(blob_sha=blob_sha)
+
+        uploaded = self._upload_blob(repo, source)
+        if uploaded != blob_sha:
+            raise RuntimeError(f"Blob SHA mismatch for {path}: expected {blob_sha}, got {uploaded}")
+
+        repository = self.client.get_repo(repo)
+        ref = repository.get_git_ref(f"heads/{branch}")
+        parent = repository.get_git_commit(ref.object.sha)
+        tree = repository.create_git_tree(
+            [InputGitTreeElement(path, "100644", "blob", sha=blob_sha)],
+            base_tree=parent.tree,
+        )
+        commit = repository.create_git_commit(commit_message, tree, [parent])
+        ref.edit(commit.sha)
+        Logger.get_logger().debug(f"  - Uploaded {path} ({os.path.getsize(source)} bytes)")
+        return PushResult(blob_sha=blob_sha, commit=commit.sha, parent=parent.sha)
+
+    def _upload_blob(self, repo: str, source: str) -> str:
+        # PyGithub needs the whole base64 payload in memory, so the blob is
+        # posted directly with a chunked request body instead.
+        def body() -> Iterator[bytes]:
+            yield b'{"encoding":"base64","content":"'
+            for chunk in iter_file_chunks(source, BLOB_CHUNK_SIZE):
+                yield base64.b64encode(chunk)
+            yield b'"}'
+
+        response = requests.post(
+            f"{self.client.requester.base_url}/repos/{repo}/git/blobs",
+            data=body(),
+            headers={
+                "Authorization": f"token {self.token}",
+                "Accept": "application/vnd.github+json",
+                "Content-Type": "application/json",
+            },
+            timeout=BLOB_UPLOAD_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()["sha"]
 
     def delete(
         self,
@@ -49,8 +200,53 @@ class GitHubProvider(ProviderInterface):
         """
         repository = self.client.get_repo(repo)
         try:
-            contents = repository.get_contents(path, ref=branch)
-            repository.delete_file(path, commit_message, contents.sha, branch=branch)
-            Logger.get_logger().info(f"  - Deleted file {path}")
+            self._delete_file(repository, branch, path, commit_message)
         except Exception as e:
-            Logger.get_logger().error(f"  - Warning: failed to delete {path}: {e}")
\ No newline at end of file
+            Logger.get_logger().error(f"  - Warning: failed to delete {path}: {e}")
+
+    def _delete_file(self, repository, branch: str, path: str, commit_message: str) -> None:
+        """Delete one file, raising on any error other than the file being gone already."""
+        try:
+            contents = repository.get_contents(path, ref=branch)
+        except UnknownObjectException:
+            Logger.get_logger().info(f"  - {path} already deleted")
+            return
+        repository.delete_file(path, commit_message, contents.sha, branch=branch)
+        Logger.get_logger().info(f"  - Deleted file {path}")
+
+    def delete_many(
+        self,
+        repo: str,
+        branch: str,
+        paths: List[str],
+        commit_message: str
+    ) -> Optional[PushResult]:
+        """
+        Deletes several files from `branch` in a single commit by writing a
+        tree whose entries for those paths are null.
+        """
+        # Errors propagate so the engine can record and retry the deletion.
+        existing = self.get_blob_shas(repo, branch, paths)
+        repository = self.client.get_repo(repo)
+        if not existing:
+            # Couldn't check which paths exist; fall back to per-file deletes.
+            for path in paths:
+                self._delete_file(repository, branch, path, commit_message)
+            return None
+
+        present = [p for p in paths if existing.get(p)]
+        if not present:
+            Logger.get_logger().info(f"  - Nothing to delete on {repo} ({branch})")
+            return PushResult()
+
+        ref = repository.get_git_ref(f"heads/{branch}")
+        parent = repository.get_git_commit(ref.object.sha)
+        tree = repository.create_git_tree(
+            [InputGitTreeElement(p, "100644", "blob", sha=None) for p in present],
+            base_tree=parent.tree,
+        )
+        commit = repository.create_git_commit(commit_message, tree, [parent])
+        ref.edit(commit.sha)
+        for p in present:
+            Logger.get_logger().info(f"  - Deleted file {p}")
+        return PushResult(commit=commit.sha, parent=parent.sha)
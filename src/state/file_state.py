@@ -1,7 +1,7 @@
 import json
 import os
 import time
-from typing import List, Tuple, Set
+from typing import Callable, Dict, List, Optional, Tuple, Set
 from src.core.interfaces import StateInterface
 
 class FileStateManager(StateInterface):
@@ -22,78 +22,100 @@ class FileStateManager(StateInterface):
             json.dump(self.state, f, indent=2)
         os.replace(tmp, self.path)
 
+    def retain_repos(self, predicate: Callable[[str], bool]) -> None:
+        """
+        Drop every repo for which `predicate(repo)` is False, e.g. to carve a
+        shard partition out of a full state file.
+        """
+        providers = self.state.setdefault("repos", {})
+        for provider_name in list(providers):
+            repos = providers[provider_name]
+            for repo in [r for r in repos if not predicate(r)]:
+                del repos[repo]
+            if not repos:
+                del providers[provider_name]
+
+    def merge(self, other: dict) -> None:
+        """
+        Merge another state document into this one. Partitions are expected to
+        be disjoint by repo; if a repo appears in both, the copy with the most
+        recent `updated_at` wins as a whole.
+        """
+        providers = self.state.setdefault("repos", {})
+        for provider_name, repos in other.get("repos", {}).items():
+            target = providers.setdefault(provider_name, {})
+            for repo, entry in repos.items():
+                current = target.get(repo)
+                if current is None or self._last_updated(entry) >= self._last_updated(current):
+                    target[repo] = entry
+
+    @staticmethod
+    def _last_updated(repo_entry: dict) -> str:
+        return max(
+            (f.get("updated_at", "") for b in repo_entry.get("branches", {}).values()
+             for f in b.get("files", {}).values()),
+            default="",
+        )
+
     def _get_branch_files(self, repo: str, branch: str, provider_name: str) -> dict:
         return self.state.get("repos", {}).get(provider_name, {}).get(repo, {}).get("branches", {}).get(branch, {}).get("files", {})
 
     def get_file_entry(self, repo: str, branch: str, key: str, provider_name: str) -> dict:
         return self._get_branch_files(repo, branch, provider_name).get(key, {})
 
-    def cleanup_old(self, repo: str, branch: str, current_keys: List[str], provider_name: str) -> List[str]:
-        removed_files = []
-        branch_files = self._get_branch_files(repo, branch, provider_name)
-        if not branch_files:
-            return removed_files
-
-        old_keys = set(branch_files.keys())
-        to_remove = old_keys - set(current_keys)
-
-        for key in to_remove:
-            file_entry = branch_files[key]
-            path = file_entry.get("path")
-            if path:
-                removed_files.append(path)
-            del branch_files[key]
-
-        # Clean up empty structures
-        provider_repos = self.state["repos"].get(provider_name, {})
-        repo_entry = provider_repos.get(repo, {})
-        branches = repo_entry.get("branches", {})
-
-        if not branch_files:
-            branches.pop(branch, None)
-            if not branches:
-                provider_repos.pop(repo, None)
-                if not provider_repos:
-                    self.state["repos"].pop(provider_name, None)
-
-        return removed_files
-
-    def cleanup_old_branches(self, repo: str, active_branches: Set[str], provider_name: str) -> List[Tuple[str, str]]:
-        removed_files = []
+    def stale_files(self, repo: str, keep: Dict[str, Set[str]], active_branches: Set[str], provider_name: str) -> List[Tuple[str, str, str]]:
         repo_branches = self.state.get("repos", {}).get(provider_name, {}).get(repo, {}).get("branches", {})
         if not repo_branches:
-            return removed_files
+            return []
 
-        branches_to_remove = set(repo_branches.keys()) - active_branches
+        tracked = {(branch, key) for branch, entry in repo_branches.items() for key in entry.get("files", {})}
+        wanted = {(branch, key) for branch, keys in keep.items() for key in keys}
+        untouched = {(branch, key) for branch, key in tracked if branch in active_branches and branch not in keep}
 
-        for branch in branches_to_remove:
-            branch_files = repo_branches.get(branch, {}).get("files", {})
-            for file_entry in branch_files.values():
-                path = file_entry.get("path")
-                if path:
-                    removed_files.append((branch, path))
-            repo_branches.pop(branch, None)
+        return [(branch, key, repo_branches[branch]["files"][key].get("path"))
+                for branch, key in sorted(tracked - wanted - untouched)]
 
-        provider_repos = self.state["repos"].get(provider_name, {})
-        if not repo_branches:
+    def remove_file_entries(self, repo: str, branch: str, keys: List[str], provider_name: str) -> None:
+        provider_repos = self.state.get("repos", {}).get(provider_name, {})
+        repo_branches = provider_repos.get(repo, {}).get("branches", {})
+        branch_files = repo_branches.get(branch, {}).get("files", {})
+        for key in keys:
+            branch_files.pop(key, None)
+
+        # Clean up empty structures
+        if branch in repo_branches and not branch_files:
+            repo_branches.pop(branch)
+        if repo in provider_repos and not repo_branches:
             provider_repos.pop(repo, None)
             if not provider_repos:
                 self.state["repos"].pop(provider_name, None)
 
-        return removed_files
-
-    def update_file_entry(self, repo: str, branch: str, key: str, file_path: str, sha: str, rendered: str, provider_name: str) -> None:
-        self.state.setdefault("repos", {}) \
+    def update_file_entry(self, repo: str, branch: str, key: str, file_path: str, sha: str, rendered: str, provider_name: str, blob_sha: Optional[str] = None) -> None:
+        entry = {
+            "path": file_path,
+            "sha": sha,
+            "updated_at": self._now_iso()
+        }
+        # Static assets are tracked by hash only
+        if rendered is not None:
+            entry["rendered"] = rendered
+        if blob_sha:
+            entry["blob_sha"] = blob_sha
+        self._branch_entry(repo, branch, provider_name).setdefault("files", {})[key] = entry
+
+    def get_branch_meta(self, repo: str, branch: str, provider_name: str) -> dict:
+        branch_entry = self.state.get("repos", {}).get(provider_name, {}).get(repo, {}).get("branches", {}).get(branch, {})
+        return {k: v for k, v in branch_entry.items() if k != "files"}
+
+    def update_branch_meta(self, repo: str, branch: str, provider_name: str, **meta) -> None:
+        self._branch_entry(repo, branch, provider_name).update(meta)
+
+    def _branch_entry(self, repo: str, branch: str, provider_name: str) -> dict:
+        return self.state.setdefault("repos", {}) \
             .setdefault(provider_name, {}) \
             .setdefault(repo, {}) \
             .setdefault("branches", {}) \
-            .setdefault(branch, {}) \
-            .setdefault("files", {})[key] = {
-                "path": file_path,
-                "sha": sha,
-                "rendered": rendered,
-                "updated_at": self._now_iso()
-            }
+            .setdefault(branch, {})
 
     @staticmethod
     def _now_iso() -> str:
@@ -0,0 +1,106 @@
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+PENDING = "pending"
+APPLIED = "applied"
+FAILED = "failed"
+
+
+class RunManifest:
+    """
+    Persisted plan of one sync run plus the status of every item.
+
+    The plan is written once as `<run_id>.json`; status changes are appended
+    to `<run_id>.status.jsonl` so recording progress stays O(1) per item
+    however large the plan is. Replaying the log gives the latest status.
+    """
+
+    def __init__(self, runs_dir: str, run_id: str, items: List[dict], heads: Dict[Tuple[str, str], str], provider_name: str):
+        self.runs_dir = runs_dir
+        self.run_id = run_id
+        self.items = items
+        self.heads = heads
+        self.provider_name = provider_name
+        self.statuses: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def runs_dir_for(state_file: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(state_file)), ".git-pilot-runs")
+
+    @property
+    def plan_path(self) -> str:
+        return os.path.join(self.runs_dir, f"{self.run_id}.json")
+
+    @property
+    def status_path(self) -> str:
+        return os.path.join(self.runs_dir, f"{self.run_id}.status.jsonl")
+
+    @classmethod
+    def create(cls, runs_dir: str, plan: List[dict], heads: Dict[Tuple[str, str], str], provider_name: str) -> "RunManifest":
+        run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + secrets.token_hex(3)
+        manifest = cls(runs_dir, run_id, plan, heads, provider_name)
+        os.makedirs(runs_dir, exist_ok=True)
+        tmp = manifest.plan_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "run_id": run_id,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "provider": provider_name,
+                "heads": [[repo, branch, inputs] for (repo, branch), inputs in heads.items()],
+                "items": plan,
+            }, f)
+        os.replace(tmp, manifest.plan_path)
+        return manifest
+
+    @classmethod
+    def load(cls, runs_dir: str, run_id: str) -> "RunManifest":
+        path = os.path.join(runs_dir, f"{run_id}.json")
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown run '{run_id}' (no manifest at {path})")
+        with open(path) as f:
+            data = json.load(f)
+        heads = {(repo, branch): inputs for repo, branch, inputs in data.get("heads", [])}
+        manifest = cls(runs_dir, run_id, data["items"], heads, data.get("provider"))
+        if os.path.exists(manifest.status_path):
+            with open(manifest.status_path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from an interrupted write
+                        continue
+                    manifest.statuses[record["id"]] = record
+        return manifest
+
+    def status(self, idx: int) -> str:
+        return self.statuses.get(idx, {}).get("status", PENDING)
+
+    def mark(self, idx: int, status: str, error: Optional[str] = None, **extra) -> None:
+        record = {"id": idx, "status": status, "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **extra}
+        if error:
+            record["error"] = error
+        with self._lock:
+            self.statuses[idx] = record
+            with open(self.status_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, APPLIED: 0, FAILED: 0}
+        for idx in range(len(self.items)):
+            counts[self.status(idx)] += 1
+        return counts
+
+    def remove(self) -> None:
+        for path in (self.plan_path, self.status_path):
+            if os.path.exists(path):
+                os.remove(path)
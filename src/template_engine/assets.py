@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Tuple
+from src.utils.hash import compute_file_shas
+
+ASSETS_DIR = 'assets'
+
+
+class AssetStore:
+    """
+    Static files under `<template_dir>/assets/`, synced byte-for-byte without
+    rendering. Files are never loaded whole: hashes are computed in chunks
+    and memoized per (size, mtime) for the lifetime of the store.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = os.path.join(root_dir, ASSETS_DIR)
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str, str]] = {}
+
+    @staticmethod
+    def key(name: str) -> str:
+        """State key of an asset; prefixed so it can't collide with template names."""
+        return f"{ASSETS_DIR}/{name}"
+
+    @staticmethod
+    def is_key(key: str) -> bool:
+        return key.startswith(f"{ASSETS_DIR}/")
+
+    @staticmethod
+    def name(key: str) -> str:
+        return key[len(ASSETS_DIR) + 1:]
+
+    def list_assets(self) -> List[str]:
+        names = []
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            dirnames.sort()
+            for f in sorted(filenames):
+                names.append(os.path.relpath(os.path.join(dirpath, f), self.root_dir).replace(os.sep, '/'))
+        return names
+
+    def select(self, names: List[str], patterns) -> List[str]:
+        return [n for n in names if any(re.fullmatch(p, n) for p in patterns)]
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root_dir, *name.split('/'))
+
+    def _hash(self, name: str) -> Tuple[str, str]:
+        path = self.path(name)
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        cached = self._hashes.get(name)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, *compute_file_shas(path))
+            self._hashes[name] = cached
+        return cached[1], cached[2]
+
+    def sha(self, name: str) -> str:
+        """sha256 of the asset, as stored in state."""
+        return self._hash(name)[0]
+
+    def blob_sha(self, name: str) -> str:
+        """Git blob SHA of the asset, as the provider will report it."""
+        return self._hash(name)[1]
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for name in self.list_assets():
+            digest.update(name.encode('utf-8') + b'\0' + self.sha(name).encode('ascii'))
+        return digest.hexdigest()
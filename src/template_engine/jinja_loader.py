@@ -1,30 +1,92 @@
+import hashlib
 import os
+from typing import Callable, Optional
 from src.core.interfaces import TemplateInterface
+from src.template_engine.assets import ASSETS_DIR
 from jinja2 import Environment, FileSystemLoader, ChoiceLoader, TemplateNotFound, pass_context
 
+HELPERS_TEMPLATE = '_helpers.tpl'
+
+
+class TrackingEnvironment(Environment):
+    """
+    Records the name of every template fetched while `loaded` is a set.
+    include, import and extends (tag or include() global) all go through
+    get_template/select_template, cached or not.
+    """
+    loaded = None
+
+    def _record(self, tmpl):
+        if self.loaded is not None:
+            self.loaded.add(tmpl.name)
+        return tmpl
+
+    def get_template(self, name, parent=None, globals=None):
+        return self._record(super().get_template(name, parent, globals))
+
+    def select_template(self, names, parent=None, globals=None):
+        return self._record(super().select_template(names, parent, globals))
+
 class JinjaTemplateEngine(TemplateInterface):
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, ignore: Optional[Callable[[str], bool]] = None):
         self.root_dir = root_dir
-        includes = os.path.join(root_dir, 'includes')
-        loader = ChoiceLoader([FileSystemLoader(root_dir), FileSystemLoader(includes)])
-        self.env = Environment(loader=loader, variable_start_string='[[',
+        # Predicate on absolute paths for files under the root that are not template inputs
+        self.ignore = ignore
+        self.includes_dir = os.path.join(root_dir, 'includes')
+        # template name -> every template name loaded while rendering it
+        self.dependencies = {}
+        loader = ChoiceLoader([FileSystemLoader(root_dir), FileSystemLoader(self.includes_dir)])
+        self.env = TrackingEnvironment(loader=loader, variable_start_string='[[',
                                variable_end_string=']]', block_start_string='[%',
                                block_end_string='%]', trim_blocks=True, lstrip_blocks=True)
-        try:
-            helpers = self.env.get_template('_helpers.tpl').module
-            self.env.globals['_'] = helpers
-        except TemplateNotFound:
-            self.env.globals['_'] = None
+        self.reload_helpers()
         @pass_context
         def include(ctx, name, **kwargs):
             new_ctx = dict(ctx); new_ctx.update(kwargs)
             return self.env.get_template(name).render(new_ctx)
         self.env.globals['include'] = include
 
+    def reload_helpers(self) -> None:
+        try:
+            helpers = self.env.get_template(HELPERS_TEMPLATE).module
+            self.env.globals['_'] = helpers
+        except TemplateNotFound:
+            self.env.globals['_'] = None
+
     def list_templates(self, template_dir: str):
         return [f for f in os.listdir(self.root_dir)
                 if f.endswith('.j2') and os.path.isfile(os.path.join(self.root_dir, f))]
 
+    def ignores(self, path: str) -> bool:
+        """True for files under the root that no render reads: assets, VCS metadata and `ignore` matches."""
+        path = os.path.abspath(path)
+        top = os.path.relpath(path, os.path.abspath(self.root_dir)).split(os.sep, 1)[0]
+        if top in (ASSETS_DIR, '.git'):
+            return True
+        return bool(self.ignore and self.ignore(path))
+
+    def fingerprint(self) -> str:
+        """
+        Digest of every file under the root that the loader can reach,
+        since includes resolve against the whole template directory.
+        """
+        digest = hashlib.sha256()
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            dirnames[:] = sorted(d for d in dirnames if not self.ignores(os.path.join(dirpath, d)))
+            paths.extend(p for p in (os.path.join(dirpath, f) for f in sorted(filenames)) if not self.ignores(p))
+        for path in paths:
+            digest.update(os.path.relpath(path, self.root_dir).encode('utf-8') + b'\0')
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
     def render(self, template_name: str, vars: dict) -> str:
         tmpl = self.env.get_template(template_name)
-        return tmpl.render(vars)
+        self.env.loaded = set()
+        try:
+            content = tmpl.render(vars)
+            self.dependencies.setdefault(template_name, set()).update(self.env.loaded)
+        finally:
+            self.env.loaded = None
+        return content
@@ -0,0 +1,51 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+from src.template_engine.jinja_loader import JinjaTemplateEngine
+
+# Per-process engine, built once by the pool initializer
+_engine = None
+
+
+def _init_worker(root_dir: str) -> None:
+    global _engine
+    _engine = JinjaTemplateEngine(root_dir)
+
+
+def _render(job: Tuple[str, Dict]) -> str:
+    template_name, vars = job
+    return _engine.render(template_name, vars)
+
+
+class ParallelRenderer:
+    """
+    Renders (template, vars) jobs on a pool of worker processes. Each worker
+    builds its own Jinja environment from `root_dir`, so output is identical
+    to rendering with `JinjaTemplateEngine` in the main process.
+    """
+
+    def __init__(self, root_dir: str, workers: int, chunksize: int = None):
+        self.root_dir = root_dir
+        self.workers = workers
+        self.chunksize = chunksize
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.root_dir,),
+            )
+        return self._pool
+
+    def render_many(self, jobs: List[Tuple[str, Dict]]) -> Iterator[str]:
+        """Yield rendered contents in job order as chunks complete."""
+        # A few chunks per worker keeps the pool busy without paying
+        # per-job IPC; jobs in a chunk share one pickle of common defaults.
+        chunksize = self.chunksize or max(1, len(jobs) // (self.workers * 4))
+        return self._get_pool().map(_render, jobs, chunksize=chunksize)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
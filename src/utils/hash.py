@@ -1,4 +1,44 @@
 import hashlib
+import mmap
+import os
 
 def compute_sha(content: str) -> str:
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def compute_git_blob_sha(content: str) -> str:
+    """SHA-1 object id git assigns to a blob with this content."""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def iter_file_chunks(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield a file in chunks read through a read-only memory map, so at most
+    one chunk is held in memory at a time.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, len(mm), chunk_size):
+                yield mm[start:start + chunk_size]
+
+
+def compute_file_git_blob_sha(path: str) -> str:
+    """Git blob object id of a file, hashed in chunks."""
+    digest = hashlib.sha1(b"blob %d\0" % os.path.getsize(path))
+    for chunk in iter_file_chunks(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_file_shas(path: str) -> tuple:
+    """(sha256, git blob object id) of a file, both computed in one read."""
+    sha256 = hashlib.sha256()
+    blob = hashlib.sha1(b"blob %d\0" % os.path.getsize(path))
+    for chunk in iter_file_chunks(path):
+        sha256.update(chunk)
+        blob.update(chunk)
+    return sha256.hexdigest(), blob.hexdigest()
@@ -1,10 +1,54 @@
 import logging
 import os
+import threading
+import time
 from colorama import Fore, init
 
 # Initialize colorama
 init(autoreset=True)
 
+# Pass as `extra=` for run summary lines that must never be throttled
+SUMMARY = {"summary": True}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `per_second` INFO (and DEBUG) records per second.
+    Warnings, errors and SUMMARY records always pass; the first record let
+    through after a throttled window reports how many lines were dropped.
+    """
+
+    def __init__(self, per_second: int):
+        super().__init__()
+        self.per_second = per_second
+        self._window = 0
+        self._count = 0
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._count = 0
+            exempt = record.levelno >= logging.WARNING or getattr(record, "summary", False)
+            if not exempt and self._count >= self.per_second:
+                self._suppressed += 1
+                return False
+            self._count += 1
+            if self._suppressed:
+                record.msg = f"{record.msg} (+{self._suppressed} line(s) suppressed)"
+                self._suppressed = 0
+        return True
+
+    def flush(self) -> int:
+        """Return and reset the number of lines dropped since the last one let through."""
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, 0
+        return suppressed
+
+
 class Logger:
     _instance = None
     _default_colors = {
@@ -36,6 +80,32 @@ class Logger:
 
         return logger
 
+    @classmethod
+    def throttle(cls, per_second: int):
+        """
+        Cap INFO output at `per_second` lines per second; 0 removes the cap.
+        Lines dropped by the previous cap and not yet reported are reported now.
+        """
+        logger = cls.get_logger()
+        suppressed = 0
+        for handler in logger.handlers:
+            for f in [f for f in handler.filters if isinstance(f, RateLimitFilter)]:
+                suppressed = max(suppressed, f.flush())
+                handler.removeFilter(f)
+            if per_second:
+                handler.addFilter(RateLimitFilter(per_second))
+        if suppressed:
+            logger.info(f"{suppressed} log line(s) suppressed", extra=SUMMARY)
+
+    @classmethod
+    def set_stream(cls, stream):
+        """Point console output at `stream`, returning the previous stream."""
+        previous = None
+        for handler in cls.get_logger().handlers:
+            if isinstance(handler, logging.StreamHandler):
+                previous = handler.setStream(stream) or previous
+        return previous
+
     @classmethod
     def _get_colored_formatter(cls):
         # Custom formatter that adds color to the log level